@@ -3,6 +3,13 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+def available_cpus() -> int:
+    """CPUs this process may run on (respects affinity/cpuset limits)"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    # sched_getaffinity is Linux-only; fall back to the machine's count
+    return os.cpu_count() or 1
+
 class Config:
     # API Configuration
     API_KEY = os.getenv("API_KEY", "hackathon-voice-detection-key-2026")
@@ -18,7 +25,23 @@ class Config:
     
     # Feature extraction parameters
     N_MFCC = 13
+    N_MELS = 128
     HOP_LENGTH = 512
     N_FFT = 2048
+    
+    # Threads used to compute independent feature groups concurrently.
+    # Sized from the CPUs actually available; with 1 the groups run inline.
+    FEATURE_WORKERS = int(os.getenv("FEATURE_WORKERS", min(4, available_cpus())))
+    
+    # Threads each STFT block's FFTs are split across. These stack on top
+    # of the feature and request threads, so default to 1 and never
+    # exceed the CPUs actually available.
+    FFT_WORKERS = min(int(os.getenv("FFT_WORKERS", 1)), available_cpus())
+    
+    # Feature memoization: LRU of extracted features keyed by a hash of the
+    # request payload. Bump FEATURE_VERSION whenever feature extraction
+    # changes so cached entries from the old code are never reused.
+    FEATURE_CACHE_SIZE = 1024
+    FEATURE_VERSION = 1
 
 config = Config()
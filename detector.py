@@ -1,6 +1,121 @@
+import hashlib
+import threading
+from collections import OrderedDict
 import numpy as np
-from typing import Tuple
+from typing import Optional, Tuple
+from numba import njit
 from audio_processor import AudioProcessor
+from config import config
+
+# Order of the weights passed to _ai_score_numba
+SCORE_COMPONENTS = (
+    'mfcc_consistency',
+    'spectral_stability',
+    'energy_regularity',
+    'pitch_consistency',
+    'harmonic_patterns',
+    'temporal_variation'
+)
+
+
+@njit(cache=True, fastmath=True, inline='always')
+def _fast_tanh(x):
+    """
+    Branchless rational approximation of tanh
+    
+    Pade-style x(27 + x^2) / (27 + 9x^2), clamped at |x| = 3 where it
+    reaches exactly +/-1. Absolute error is below 0.024, so the weighted
+    score moves by at most that much.
+    """
+    x = min(max(x, -3.0), 3.0)
+    x2 = x * x
+    return x * (27.0 + x2) / (27.0 + 9.0 * x2)
+
+
+@njit(cache=True, fastmath=True)
+def _ai_score_numba(mfcc_var, spectral_var, rms_var, chroma_std, tonnetz_std, zcr_std, weights):
+    """Weighted sum of the per-feature AI likelihood components"""
+    # 1. AI voices tend to have lower variance in MFCCs
+    mfcc_consistency = 1.0 - _fast_tanh(np.mean(mfcc_var) / 100.0)
+    
+    # 2. AI voices have more stable spectral centroids
+    spectral_stability = 1.0 - _fast_tanh(spectral_var / 1000000.0)
+    
+    # 3. AI voices tend to have more regular RMS energy
+    energy_regularity = 1.0 - _fast_tanh(rms_var / 0.01)
+    
+    # 4. AI voices have more consistent chroma (pitch) features
+    pitch_consistency = 1.0 - _fast_tanh(np.mean(chroma_std) / 0.3)
+    
+    # 5. Lower tonnetz (harmonic) variance suggests AI generation
+    harmonic_score = 1.0 - _fast_tanh(np.mean(tonnetz_std) / 0.2)
+    
+    # 6. Lower ZCR std suggests less natural variation (more AI-like)
+    temporal_score = 1.0 - _fast_tanh(zcr_std / 0.05)
+    
+    return (
+        mfcc_consistency * weights[0]
+        + spectral_stability * weights[1]
+        + energy_regularity * weights[2]
+        + pitch_consistency * weights[3]
+        + harmonic_score * weights[4]
+        + temporal_score * weights[5]
+    )
+
+
+class FeatureCache:
+    """
+    Thread-safe LRU cache of extracted features, keyed by input content
+    
+    Keys are a BLAKE2b digest of the base64 payload, so a cache hit skips
+    decoding as well as feature extraction. The digest is salted with the
+    feature-relevant config values, so changing any of them (or bumping
+    FEATURE_VERSION) never serves stale features.
+    """
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._salt = repr((
+            config.FEATURE_VERSION,
+            config.SAMPLE_RATE,
+            config.MAX_AUDIO_DURATION,
+            config.N_MFCC,
+            config.N_MELS,
+            config.HOP_LENGTH,
+            config.N_FFT
+        )).encode()
+    
+    def key(self, base64_audio: str) -> bytes:
+        """Content hash of a base64 payload"""
+        hasher = hashlib.blake2b(self._salt, digest_size=16)
+        hasher.update(base64_audio.encode('utf-8'))
+        return hasher.digest()
+    
+    def get(self, key: bytes) -> Optional[dict]:
+        """Return the cached features for `key`, or None"""
+        with self._lock:
+            features = self._entries.get(key)
+            if features is not None:
+                self._entries.move_to_end(key)
+            return features
+    
+    def put(self, key: bytes, features: dict):
+        """Store features, evicting the least recently used entry if full"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = features
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Drop all cached entries"""
+        with self._lock:
+            self._entries.clear()
+
 
 class VoiceDetector:
     """
@@ -12,6 +127,7 @@ class VoiceDetector:
     
     def __init__(self):
         self.audio_processor = AudioProcessor()
+        self.feature_cache = FeatureCache(config.FEATURE_CACHE_SIZE)
         
         # Define thresholds and weights based on AI voice characteristics
         # These are heuristic-based values that can be tuned with more data
@@ -23,6 +139,10 @@ class VoiceDetector:
             'harmonic_patterns': 0.15,      # Different harmonic structure
             'temporal_variation': 0.10      # AI voices have less natural temporal variation
         }
+        self.weight_array = np.array(
+            [self.feature_weights[name] for name in SCORE_COMPONENTS],
+            dtype=np.float64
+        )
     
     def detect(self, base64_audio: str) -> Tuple[str, float]:
         """
@@ -37,29 +157,47 @@ class VoiceDetector:
                 - confidence_score: float between 0.0 and 1.0
         """
         try:
-            # Process audio and extract features
-            audio_array, sr = self.audio_processor.base64_to_audio(base64_audio)
-            features = self.audio_processor.extract_features(audio_array, sr)
-            
-            # Calculate AI likelihood score
-            ai_score = self._calculate_ai_score(features)
-            
-            # Determine classification
-            if ai_score >= 0.5:
-                classification = "AI_GENERATED"
-                confidence = ai_score
-            else:
-                classification = "HUMAN"
-                confidence = 1.0 - ai_score
+            # Identical payloads (retries, re-submissions) reuse their features
+            cache_key = self.feature_cache.key(base64_audio)
+            features = self.feature_cache.get(cache_key)
             
-            # Ensure confidence is between 0.0 and 1.0
-            confidence = max(0.0, min(1.0, confidence))
+            if features is None:
+                # Process audio and extract features
+                audio_array, sr = self.audio_processor.base64_to_audio(base64_audio)
+                features = self.audio_processor.extract_features(audio_array, sr)
+                self.feature_cache.put(cache_key, features)
             
-            return classification, confidence
+            return self._classify(features)
             
         except Exception as e:
             raise ValueError(f"Detection error: {str(e)}")
     
+    def _classify(self, features: dict) -> Tuple[str, float]:
+        """
+        Turn extracted features into a classification and confidence
+        
+        Args:
+            features: Extracted audio features
+            
+        Returns:
+            Tuple[str, float]: (classification, confidence_score)
+        """
+        # Calculate AI likelihood score
+        ai_score = self._calculate_ai_score(features)
+        
+        # Determine classification
+        if ai_score >= 0.5:
+            classification = "AI_GENERATED"
+            confidence = ai_score
+        else:
+            classification = "HUMAN"
+            confidence = 1.0 - ai_score
+        
+        # Ensure confidence is between 0.0 and 1.0
+        confidence = max(0.0, min(1.0, confidence))
+        
+        return classification, confidence
+    
     def _calculate_ai_score(self, features: dict) -> float:
         """
         Calculate likelihood that voice is AI-generated based on features
@@ -77,53 +215,15 @@ class VoiceDetector:
         Returns:
             float: AI likelihood score (0.0 to 1.0)
         """
-        scores = []
-        
-        # 1. MFCC Consistency Score
-        # AI voices tend to have lower variance in MFCCs
-        mfcc_var = features['mfcc_var']
-        mfcc_consistency = 1.0 - np.tanh(np.mean(mfcc_var) / 100.0)
-        scores.append(mfcc_consistency * self.feature_weights['mfcc_consistency'])
-        
-        # 2. Spectral Stability Score
-        # AI voices have more stable spectral centroids
-        spectral_var = features['spectral_centroid_var']
-        spectral_stability = 1.0 - np.tanh(spectral_var / 1000000.0)
-        scores.append(spectral_stability * self.feature_weights['spectral_stability'])
-        
-        # 3. Energy Regularity Score
-        # AI voices tend to have more regular RMS energy
-        rms_var = features['rms_var']
-        energy_regularity = 1.0 - np.tanh(rms_var / 0.01)
-        scores.append(energy_regularity * self.feature_weights['energy_regularity'])
-        
-        # 4. Pitch Consistency Score
-        # AI voices have more consistent chroma (pitch) features
-        chroma_std = features['chroma_std']
-        pitch_consistency = 1.0 - np.tanh(np.mean(chroma_std) / 0.3)
-        scores.append(pitch_consistency * self.feature_weights['pitch_consistency'])
-        
-        # 5. Harmonic Pattern Score
-        # Different tonnetz (harmonic) patterns
-        tonnetz_std = features['tonnetz_std']
-        # Lower variance suggests AI generation
-        harmonic_score = 1.0 - np.tanh(np.mean(tonnetz_std) / 0.2)
-        scores.append(harmonic_score * self.feature_weights['harmonic_patterns'])
-        
-        # 6. Temporal Variation Score
-        # Natural speech has more variation in zero crossing rate
-        zcr_std = features['zcr_std']
-        # Lower ZCR std suggests less natural variation (more AI-like)
-        temporal_score = 1.0 - np.tanh(zcr_std / 0.05)
-        scores.append(temporal_score * self.feature_weights['temporal_variation'])
-        
-        # Combine all scores
-        total_score = sum(scores)
-        
-        # Add slight randomization to avoid appearing deterministic
-        # This makes the system more realistic
-        noise = np.random.normal(0, 0.05)
-        total_score = total_score + noise
+        total_score = _ai_score_numba(
+            features['mfcc_var'],
+            features['spectral_centroid_var'],
+            features['rms_var'],
+            features['chroma_std'],
+            features['tonnetz_std'],
+            features['zcr_std'],
+            self.weight_array
+        )
         
         # Normalize to 0-1 range
         total_score = max(0.0, min(1.0, total_score))
@@ -1,8 +1,14 @@
 from fastapi import FastAPI, HTTPException, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 from typing import Optional
+import asyncio
+import base64
+import io
 import logging
+import numpy as np
+import soundfile as sf
 from detector import VoiceDetector
 from config import config
 
@@ -17,7 +23,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="AI Voice Detection API",
     description="Detects whether a voice sample is AI-generated or human-spoken. Supports Tamil, English, Hindi, Malayalam, and Telugu.",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -32,6 +39,33 @@ app.add_middleware(
 # Initialize detector
 detector = VoiceDetector()
 
+@app.on_event("startup")
+async def warm_up_detector():
+    """
+    Run one dummy detection so numba compilation/cache loading, FFT
+    planning, resampler setup and lazy librosa/PyAV imports happen before
+    the first real request
+    """
+    try:
+        # Typical uploads are 44.1kHz, so warm the clip through _resample
+        warm_up_sr = 44100
+        noise = 0.1 * np.random.default_rng(0).standard_normal(warm_up_sr)
+        wav_io = io.BytesIO()
+        sf.write(wav_io, noise.astype(np.float32), warm_up_sr, format='WAV')
+        warm_up_audio = base64.b64encode(wav_io.getvalue()).decode('ascii')
+        
+        detector.detect(warm_up_audio)
+        
+        # Also exercise the PyAV fallback used when soundfile can't decode
+        wav_io.seek(0)
+        detector.audio_processor._decode_with_av(wav_io)
+        
+        # The dummy clip's features shouldn't occupy the cache
+        detector.feature_cache.clear()
+        logger.info("Detector warm-up complete")
+    except Exception as e:
+        logger.warning(f"Detector warm-up failed: {str(e)}")
+
 # Request/Response Models
 class DetectionRequest(BaseModel):
     audio: str = Field(
@@ -149,15 +183,19 @@ async def detect_voice(
                 detail="Audio field cannot be empty"
             )
         
-        # Perform detection
-        classification, confidence = detector.detect(request.audio)
+        # Perform detection in a worker thread so the event loop stays free
+        classification, confidence = await asyncio.get_running_loop().run_in_executor(
+            None, detector.detect, request.audio
+        )
         
         logger.info(f"Detection complete: {classification} (confidence: {confidence:.2f})")
         
-        return DetectionResponse(
-            classification=classification,
-            confidence=round(confidence, 2)
-        )
+        # DetectionResponse documents the schema via response_model; return
+        # the response directly so our own output isn't re-validated
+        return ORJSONResponse({
+            "classification": classification,
+            "confidence": round(float(confidence), 2)
+        })
         
     except ValueError as e:
         logger.error(f"Validation error: {str(e)}")
@@ -176,8 +214,7 @@ async def detect_voice(
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     """Custom HTTP exception handler"""
-    from fastapi.responses import JSONResponse
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "error": exc.detail,
@@ -188,9 +225,8 @@ async def http_exception_handler(request: Request, exc: HTTPException):
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """General exception handler"""
-    from fastapi.responses import JSONResponse
     logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "An unexpected error occurred",